@@ -1 +1 @@
-from .git_flow_library import GitFlowLibrary
\ No newline at end of file
+from .git_flow_library import GitFlowLibrary, GitFlowRepo
\ No newline at end of file
@@ -1,39 +1,418 @@
+import concurrent.futures
+import contextlib
+import functools
 import logging
+import os
 from pathlib import Path
+import shlex
+import shutil
 import subprocess
+import threading
+from typing import Iterable
+
+try:
+    import pygit2
+except ImportError:
+    pygit2 = None
 
 logger = logging.getLogger(__name__)
 
-class GitFlowLibrary:
-    @staticmethod
-    def is_gitflow_enabled(directory: str | Path) -> bool:
+# Absolute path of git, resolved once so each launch skips the $PATH search.
+# Made absolute because a relative $PATH entry would otherwise be resolved
+# against each call's cwd.
+_GIT = shutil.which('git')
+_GIT = os.path.abspath(_GIT) if _GIT else 'git'
+# git flow init always sets this key, so its presence marks gitflow as enabled.
+_ENABLED_KEY = 'gitflow.branch.master'
+# Branch types whose finish creates a tag and so accepts a tag message.
+_TAG_OK = frozenset({'release', 'hotfix'})
+
+
+def _run(cmd: list[str] | str, **kwargs) -> subprocess.CompletedProcess:
+    """Runs cmd with subprocess.run; every git launch in this module goes here."""
+    return subprocess.run(cmd, **kwargs)
+
+
+def _read_env() -> dict[str, str]:
+    """Environment for read-only git commands.
+
+    GIT_OPTIONAL_LOCKS=0 tells git to skip optional locks; git older than 2.15
+    ignores it. Built per call so later os.environ changes are picked up.
+    """
+    return {**os.environ, 'GIT_OPTIONAL_LOCKS': '0'}
+
+
+def _pygit2_config(directory: str | Path) -> dict[str, str] | None:
+    """Reads the config for directory in-process with pygit2.
+
+    Returns None when pygit2 is not installed or the repository can't be opened
+    with it, in which case callers fall back to running git.
+    """
+    if pygit2 is None:
+        return None
+    try:
+        path = pygit2.discover_repository(str(directory))
+        if path is None:
+            return None
+        config = pygit2.Repository(path).config.snapshot()
+        # Index by name so the highest priority value wins, as with git config.
+        return {entry.name: config[entry.name] or '' for entry in config}
+    except (pygit2.GitError, KeyError, ValueError):
+        return None
+
+
+def _normalise_key(key: str) -> str:
+    """Lower-cases the section and variable name of a config key, as git does.
+
+    Subsections (e.g. the branch name in 'gitflow.branch.foo.base') are case
+    sensitive and left untouched.
+    """
+    section, _, rest = key.partition('.')
+    subsection, dot, name = rest.rpartition('.')
+    return f"{section.lower()}.{subsection}{dot}{name.lower()}"
+
+
+def _load_gitflow_config(directory: str | Path) -> dict[str, str] | None:
+    """Reads every gitflow.* config value for directory in one go.
+
+    Uses pygit2 if it is installed, otherwise a single
+    `git config --get-regexp` process. Returns None if git can't be run in
+    directory (e.g. it doesn't exist or git is not installed).
+    """
+    values = _pygit2_config(directory)
+    if values is not None:
+        return {
+            key: value for key, value in values.items()
+            if key.startswith('gitflow.')
+        }
+    try:
+        result = _run(
+            [_GIT, 'config', '--null', '--get-regexp', r'^gitflow\.'],
+            cwd=directory,
+            env=_read_env(),
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+    except OSError:
+        return None
+    # git exits non-zero when nothing matches, so there is no output to parse.
+    if result.returncode != 0:
+        return {}
+    out = result.stdout.decode('utf-8', 'replace')
+    values = {}
+    # With --null each entry is "key\nvalue\0"; later entries win.
+    for entry in out.split('\0'):
+        if entry:
+            key, _, value = entry.partition('\n')
+            values[key] = value
+    return values
+
+
+class _GitConfigSession:
+    """A snapshot of the gitflow.* config for a directory.
+
+    The config is read once on first access (or on entering the context), with
+    pygit2 if it is installed or a single git process otherwise, and served from
+    memory afterwards. A read that fails is treated as empty config and is
+    retried on the next access.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        values: dict[str, str] | None = None
+    ):
+        self.directory = directory
+        self._values = values
+
+    def __enter__(self) -> '_GitConfigSession':
+        self.values
+        return self
+
+    def __exit__(self, *exc_info):
+        return None
+
+    @property
+    def values(self) -> dict[str, str]:
+        if self._values is None:
+            values = self._read()
+            if values is None:
+                return {}
+            self._values = values
+        return self._values
+
+    def get(self, key: str) -> str | None:
+        return self.values.get(_normalise_key(key))
+
+    def invalidate(self):
+        """Forces the next access to re-read the config."""
+        self._values = None
+
+    def _read(self) -> dict[str, str] | None:
+        return _load_gitflow_config(self.directory)
+
+
+def _find_dot_git(path: str) -> str | None:
+    """Returns the first .git directory found in path or the directories above."""
+    while True:
+        candidate = os.path.join(path, '.git')
+        if os.path.isdir(candidate):
+            return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+class GitFlowRepo:
+    """Gitflow config lookups bound to a single repository directory.
+
+    The directory is resolved once and the git directory and gitflow config
+    snapshot are cached on the instance, so a multi-step operation only pays for
+    them once. Cached config is re-read when the repository config file changes.
+    Only <commondir>/config is watched: values coming from global or system
+    config, include.path files or config.worktree are not refreshed until this
+    repository's config is written or invalidate() is called.
+    Sessions opened with session() are pinned per thread, so a shared instance
+    can be used from several threads at once.
+
+    Args:
+        directory (str | Path): Path to repository directory.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = os.path.realpath(directory)
+        self._git_root: str | None = None
+        self._config: tuple[tuple[int, int, int], _GitConfigSession] | None = None
+        self._local = threading.local()
+
+    @classmethod
+    def for_directory(cls, directory: str | Path) -> 'GitFlowRepo':
+        """Returns the shared instance for directory, creating it if needed."""
+        return _shared_repo(os.path.abspath(directory))
+
+    @property
+    def _pinned(self) -> _GitConfigSession | None:
+        """The session pinned by session() on the calling thread, if any."""
+        return getattr(self._local, 'session', None)
+
+    @_pinned.setter
+    def _pinned(self, session: _GitConfigSession | None):
+        self._local.session = session
+
+    @property
+    def git_root(self) -> Path | None:
+        """The git directory of the repository, or None if not in a repository.
+
+        Asks git via `git rev-parse --git-dir`, which also handles worktrees
+        (where .git is a file) and bare repositories. If git can't be run, falls
+        back to the first .git directory found in directories above. A missing
+        repository is not cached so a later init is picked up.
+        """
+        if self._git_root is not None and os.path.isdir(self._git_root):
+            return Path(self._git_root)
         try:
-            result = subprocess.run(
-                ['git', 'config', '--get-regexp', '^gitflow'],
-                cwd=directory,
+            result = _run(
+                [_GIT, 'rev-parse', '--git-dir'],
+                cwd=self.directory,
+                env=_read_env(),
                 stdout=subprocess.PIPE,
                 stderr=subprocess.DEVNULL,
-                text=True
+                check=False
             )
-            return result.returncode == 0 and bool(result.stdout.strip())
-        except Exception:
-            return False
+        except OSError:
+            git_dir = _find_dot_git(self.directory)
+        else:
+            if result.returncode != 0:
+                return None
+            git_dir = os.path.normpath(os.path.join(
+                self.directory, os.fsdecode(result.stdout.rstrip(b'\n'))))
+        if git_dir is None:
+            return None
+        self._git_root = git_dir
+        return Path(git_dir)
+
+    def is_gitflow_enabled(self) -> bool:
+        """Checks whether gitflow has been initialised for the repository.
+
+        git flow init always sets gitflow.branch.master, so its presence is used
+        as the marker. Answered from the cached config snapshot.
+        """
+        session = self._session()
+        return session is not None and bool(session.get(_ENABLED_KEY))
+
+    @contextlib.contextmanager
+    def session(self):
+        """Reads the repository config once for a block of gitflow lookups.
+
+        Inside the block every config read is served from the same snapshot
+        without touching git or the filesystem again. Writes made through this
+        library (e.g. set_branch_base) refresh the snapshot. The snapshot is only
+        pinned for the calling thread; other threads keep their own.
+
+        Outside a repository an empty snapshot is yielded and nothing is pinned,
+        so lookups answer the same as they would without a session.
+
+        Yields:
+            _GitConfigSession: The config snapshot for the repository.
+        """
+        if self._pinned is not None:
+            yield self._pinned
+            return
+        session = self._session()
+        if session is None:
+            yield _GitConfigSession(self.directory, values={})
+            return
+        with session:
+            self._pinned = session
+            try:
+                yield session
+            finally:
+                self._pinned = None
+
+    def invalidate(self):
+        """Drops cached config after the repository config has been written to.
+
+        Also refreshes the calling thread's pinned session, if any.
+        """
+        self._config = None
+        if self._pinned is not None:
+            self._pinned.invalidate()
+
+    def get_config_value(self, key: str) -> str | None:
+        """Get a gitflow config value for the repository.
+
+        Args:
+            key (str): The gitflow config key to retrieve (e.g. 'branch.master')
+
+        Raises:
+            RuntimeError: If gitflow is not enabled for the repository.
+
+        Returns:
+            str | None: The configuration value if set, otherwise None.
+        """
+        session = self._session()
+        if session is None or not session.get(_ENABLED_KEY):
+            raise RuntimeError(
+                f"Tried to read gitflow config in {self.directory} but gitflow "
+                "not enabled!"
+            )
+        out = session.get(f'gitflow.{key}')
+        return out if out else None
+
+    def get_core_branches(self) -> tuple[str, str]:
+        """Get the master and develop branch names from one config read.
+
+        Raises:
+            RuntimeError: If gitflow is not enabled or either branch is not set.
+
+        Returns:
+            tuple[str, str]: The (master, develop) branch names.
+        """
+        with self.session():
+            return self.get_master_branch(), self.get_develop_branch()
+
+    def get_master_branch(self) -> str:
+        branch = self.get_config_value('branch.master')
+        if not branch:
+            raise RuntimeError(
+                "Master branch not set in gitflow config. This shouldn't be possible.")
+        return branch
+
+    def get_develop_branch(self) -> str:
+        branch = self.get_config_value('branch.develop')
+        if not branch:
+            raise RuntimeError(
+                "Develop branch not set in gitflow config. This shouldn't be possible.")
+        return branch
+
+    def get_branch_base(self, branch: str) -> str | None:
+        """Get the base branch for a given gitflow branch.
+
+        Args:
+            branch (str): The branch to find the base of.
+
+        Returns:
+            str | None: The base branch name if set, otherwise None.
+        """
+        return self.get_config_value(f'branch.{branch}.base')
+
+    def _config_version(self) -> tuple[int, int, int] | None:
+        """Identifies the current revision of the repository config file.
+
+        git rewrites the config by lockfile and rename, so the inode changes on
+        every write even when two writes land within one mtime tick.
+        """
+        git_root = self.git_root
+        if git_root is None:
+            return None
+        # Worktrees share the config of the main repository's git directory.
+        try:
+            common_dir = git_root / (git_root / 'commondir').read_text().strip()
+        except OSError:
+            common_dir = git_root
+        try:
+            st = (common_dir / 'config').stat()
+        except OSError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _session(self) -> _GitConfigSession | None:
+        """Returns the pinned session, or the cached one if config is unchanged.
+
+        Returns None outside a repository.
+        """
+        if self._pinned is not None:
+            return self._pinned
+        version = self._config_version()
+        if version is None:
+            return None
+        if self._config is not None and self._config[0] == version:
+            return self._config[1]
+        session = _GitConfigSession(self.directory)
+        self._config = (version, session)
+        return session
+
+
+@functools.lru_cache(maxsize=128)
+def _shared_repo(directory: str) -> GitFlowRepo:
+    return GitFlowRepo(directory)
+
+
+class GitFlowLibrary:
+    @staticmethod
+    def is_gitflow_enabled(directory: str | Path) -> bool:
+        """Checks whether gitflow has been initialised for a repository.
+
+        The result is cached until the repository config changes.
+
+        Args:
+            directory (str | Path): Path to repository directory.
+        """
+        return GitFlowRepo.for_directory(directory).is_gitflow_enabled()
 
     @staticmethod
     def get_git_root(directory: str | Path) -> Path | None:
-        """Returns the first .git found in directories above.
-        
+        """Returns the git directory of the repository containing directory.
+
+        See GitFlowRepo.git_root.
+
         Args:
             directory: The directory to search upward from. Defaults to 
                 current working directory.
         """
-        path = Path(directory).resolve()
-        while path != path.parent:
-            candidate = path / '.git'
-            if candidate.is_dir():
-                return candidate
-            path = path.parent
-        return None
+        return GitFlowRepo.for_directory(directory).git_root
+
+    @staticmethod
+    def session(directory: str | Path):
+        """Reads the repository config once for a block of gitflow lookups.
+
+        See GitFlowRepo.session.
+
+        Args:
+            directory (str | Path): Path to repository directory.
+        """
+        return GitFlowRepo.for_directory(directory).session()
 
     @staticmethod
     def init(directory: str | Path, defaults:bool=True):
@@ -44,12 +423,50 @@ class GitFlowLibrary:
             defaults (bool): If true use the default branch names for git-flow, if false
                 the user will be prompted. Defaults to True.
         """
-        cmd = ['git', 'flow', 'init']
+        cmd = [_GIT, 'flow', 'init']
         if defaults:
             cmd.append('-d')
 
-        logger.info(f"In {directory}: {cmd}")
-        subprocess.run(cmd, cwd=directory, check=True)
+        logger.info("In %s: %s", directory, cmd)
+        _run(cmd, cwd=directory, check=True)
+        GitFlowRepo.for_directory(directory).invalidate()
+
+    @staticmethod
+    def init_with_bases(
+        directory: str | Path,
+        bases: dict[str, str],
+        defaults: bool = True
+    ):
+        """Initialises git flow and sets branch bases in a single shell invocation.
+
+        Equivalent to calling init followed by set_branch_base for each entry of
+        bases, but chained with && in one shell so Python launches a single
+        subprocess instead of one per command. Prefer this when bootstrapping a
+        repository.
+
+        Args:
+            directory (str | Path): Where to initialise git flow.
+            bases (dict[str, str]): Mapping of branch to the base branch to set.
+            defaults (bool): If true use the default branch names for git-flow, if false
+                the user will be prompted. Defaults to True.
+        """
+        init_cmd = [_GIT, 'flow', 'init']
+        if defaults:
+            init_cmd.append('-d')
+        cmds = [init_cmd]
+        for branch, base in bases.items():
+            cmds.append([_GIT, 'flow', 'config', 'base', '--set', branch, base])
+        cmd = ' && '.join(shlex.join(c) for c in cmds)
+
+        logger.info("In %s: %s", directory, cmd)
+        _run(
+            cmd,
+            cwd=directory,
+            shell=True,
+            check=True,
+            executable='/bin/bash'
+        )
+        GitFlowRepo.for_directory(directory).invalidate()
     
     @staticmethod
     def start(
@@ -59,14 +476,57 @@ class GitFlowLibrary:
         base: str | None = None,
         fetch: bool = False
     ):
-        cmd = ['git', 'flow', branch_type, 'start']
+        cmd = [_GIT, 'flow', branch_type, 'start']
         if fetch:
             cmd.append('-f')
         cmd.append(name)
         if base:
             cmd.append(base)
 
-        subprocess.run(cmd, cwd=directory, check=True)
+        _run(cmd, cwd=directory, check=True)
+
+    @staticmethod
+    def map_start(
+        directories: Iterable[str | Path],
+        branch_type: str,
+        name: str,
+        base: str | None = None,
+        fetch: bool = False
+    ) -> dict[str | Path, Exception | None]:
+        """Start the same branch in several repositories concurrently.
+
+        Runs start for each directory on a thread pool. Each repository is
+        operated on independently, so they must not depend on one another. The
+        git flow processes share the caller's stdout and stderr, so their output
+        is interleaved.
+
+        Args:
+            directories (Iterable[str | Path]): Repository directories to start in.
+            branch_type (str): feature, release or hotfix.
+            name (str): Name of branch.
+            base (str | None, optional): Base to start from. Defaults to None.
+            fetch (bool, optional): Fetch from remote before. Defaults to False.
+
+        Returns:
+            dict[str | Path, Exception | None]: Each directory mapped to the
+                exception raised while starting there (e.g.
+                subprocess.CalledProcessError, FileNotFoundError), or None if the
+                branch was started. Every directory is attempted.
+        """
+        directories = list(directories)
+        if not directories:
+            return {}
+        max_workers = min(32, (os.cpu_count() or 1) * 4, len(directories))
+        with concurrent.futures.ThreadPoolExecutor(max_workers) as executor:
+            futures = {
+                directory: executor.submit(
+                    GitFlowLibrary.start, directory, branch_type, name, base, fetch)
+                for directory in directories
+            }
+        return {
+            directory: future.exception()
+            for directory, future in futures.items()
+        }
     
     @staticmethod
     def checkout(
@@ -74,10 +534,10 @@ class GitFlowLibrary:
         branch_type: str,
         name: str | None
     ):
-        cmd = ['git', 'flow', branch_type, 'checkout']
+        cmd = [_GIT, 'flow', branch_type, 'checkout']
         if name:
             cmd.append(name)
-        subprocess.run(cmd, cwd=directory, check=True)
+        _run(cmd, cwd=directory, check=True)
 
     @staticmethod
     def finish(
@@ -86,7 +546,7 @@ class GitFlowLibrary:
         name: str | None = None,
         fetch: bool = False,
         keep: bool = False,
-        tag_message: str | None = False
+        tag_message: str | None = None
     ):
         """Finish and merge a branch.
 
@@ -97,12 +557,15 @@ class GitFlowLibrary:
                 current branch.
             fetch (bool, optional): Fetch from remote before. Defaults to False.
             keep (bool, optional): Keep branch after finish. Defaults to False.
-            tag_message (str | None, optional): Use given tag message. Defaults to False.
+            tag_message (str | None, optional): Use given tag message. Defaults to None.
 
         Raises:
             ValueError: If tag_message used with wrong branch_type.
         """    
-        cmd = ['git', 'flow', branch_type, 'finish']
+        if tag_message is not None and branch_type not in _TAG_OK:
+            raise ValueError(
+                "tag_message is only valid for release or hotfix branches")
+        cmd = [_GIT, 'flow', branch_type, 'finish']
         if name:
             cmd.append(name)
         if fetch:
@@ -110,28 +573,31 @@ class GitFlowLibrary:
         if keep:
             cmd.append('-k')
         if tag_message:
-            if branch_type in ('release', 'hotfix'):
-                cmd.extend(['-m', tag_message])
-            else:
-                raise ValueError(
-                    "tag_message is only valid for release or hotfix branches")
-        subprocess.run(cmd, cwd=directory, check=True)
+            cmd.extend(['-m', tag_message])
+        _run(cmd, cwd=directory, check=True)
+
+    @staticmethod
+    def get_core_branches(directory: str | Path) -> tuple[str, str]:
+        """Get the master and develop branch names from one config read.
+
+        Args:
+            directory (str | Path): Path to repository directory.
+
+        Raises:
+            RuntimeError: If gitflow is not enabled or either branch is not set.
+
+        Returns:
+            tuple[str, str]: The (master, develop) branch names.
+        """
+        return GitFlowRepo.for_directory(directory).get_core_branches()
 
     @staticmethod
     def get_master_branch(directory: str | Path) -> str | None:
-        branch = GitFlowLibrary.get_config_value('branch.master', directory)
-        if not branch:
-            raise RuntimeError(
-                "Master branch not set in gitflow config. This shouldn't be possible.")
-        return branch
+        return GitFlowRepo.for_directory(directory).get_master_branch()
     
     @staticmethod
     def get_develop_branch(directory: str | Path) -> str | None:
-        branch = GitFlowLibrary.get_config_value('branch.develop', directory)
-        if not branch:
-            raise RuntimeError(
-                "Develop branch not set in gitflow config. This shouldn't be possible.")
-        return branch
+        return GitFlowRepo.for_directory(directory).get_develop_branch()
     
     @staticmethod
     def get_branch_base(branch: str, directory: str | Path) -> str | None:
@@ -144,12 +610,15 @@ class GitFlowLibrary:
         Returns:
             str | None: The base branch name if set, otherwise None.
         """        
-        return GitFlowLibrary.get_config_value(f'branch.{branch}.base', directory)
+        return GitFlowRepo.for_directory(directory).get_branch_base(branch)
     
     @staticmethod
     def set_branch_base(branch: str, base: str, directory: str | Path):
         """Set the base branch for a given gitflow branch.
 
+        When configuring several branches straight after init, init_with_bases
+        does the same in a single process.
+
         Args:
             branch (str): The branch to configure.
             base (str): The base branch name to associate.
@@ -158,15 +627,17 @@ class GitFlowLibrary:
         Raises:
             RuntimeError: If gitflow not enabled.
         """        
-        if not GitFlowLibrary.is_gitflow_enabled(directory):
+        repo = GitFlowRepo.for_directory(directory)
+        if not repo.is_gitflow_enabled():
             raise RuntimeError(
                 f"Tried to set gitflow branch base in {directory} but gitflow "
                 "not enabled!"
             )
-        subprocess.run(
-            ['git', 'flow', 'config', 'base', '--set', branch, base],
+        _run(
+            [_GIT, 'flow', 'config', 'base', '--set', branch, base],
             cwd=directory
         )
+        repo.invalidate()
     
     @staticmethod
     def get_config_value(key: str, directory: str | Path) -> str | None: 
@@ -182,15 +653,4 @@ class GitFlowLibrary:
         Returns:
             str | None: The configuration value if set, otherwise None.
         """        
-        if not GitFlowLibrary.is_gitflow_enabled(directory):
-            raise RuntimeError(
-                f"Tried to read gitflow config in {directory} but gitflow "
-                "not enabled!"
-            )
-        out = subprocess.run(
-            ['git', 'config', f'gitflow.{key}'],
-            cwd=directory,
-            capture_output=True,
-            text=True
-        ).stdout.strip()
-        return out if out else None
\ No newline at end of file
+        return GitFlowRepo.for_directory(directory).get_config_value(key)
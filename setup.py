@@ -10,4 +10,7 @@ setuptools.setup(
     author="RDK Management",
     description="A collection of utility for standardising gitflow commands in python.",
     packages=setuptools.find_packages(),
+    extras_require={
+        "pygit2": ["pygit2"],
+    },
 )
\ No newline at end of file